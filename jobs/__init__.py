@@ -2,6 +2,7 @@
 Hypernode Job Execution Modules
 """
 
+from . import _torch_setup  # noqa: F401  (must run before any job imports)
 from .llm_inference import LLMInferenceJob
 from .llm_finetuning import LLMFineTuningJob
 from .rag_indexing import RAGIndexingJob
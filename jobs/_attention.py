@@ -0,0 +1,35 @@
+"""Attention kernel selection for transformers models"""
+
+from typing import Optional
+
+from transformers import AutoConfig
+from transformers.utils import is_flash_attn_2_available
+import structlog
+
+log = structlog.get_logger()
+
+# Architectures whose transformers implementation accepts attn_implementation;
+# remote-code models (e.g. Qwen v1) raise if it is passed
+FLASH_ATTENTION_2_MODEL_TYPES = {
+    'llama', 'mistral', 'mixtral', 'qwen2', 'gemma', 'phi', 'falcon',
+    'gpt_neox', 'gpt_bigcode', 'starcoder2', 'stablelm',
+}
+SDPA_MODEL_TYPES = {
+    'llama', 'mistral', 'mixtral', 'qwen2', 'gemma', 'falcon',
+    'gpt_bigcode', 'starcoder2',
+}
+
+
+def resolve_attn_implementation(model_name: str) -> Optional[str]:
+    """Pick the fastest attention kernel the model supports, or None for its default"""
+    try:
+        model_type = AutoConfig.from_pretrained(model_name, trust_remote_code=True).model_type
+    except Exception as e:
+        log.warning("Could not read model config", model=model_name, error=str(e))
+        return None
+
+    if model_type in FLASH_ATTENTION_2_MODEL_TYPES and is_flash_attn_2_available():
+        return "flash_attention_2"
+    if model_type in SDPA_MODEL_TYPES:
+        return "sdpa"
+    return None
@@ -0,0 +1,155 @@
+"""CUDA graph replay of the single-token decode step for static-cache models"""
+
+import threading
+from typing import Iterable, Optional
+
+import torch
+from transformers.cache_utils import StaticCache
+import structlog
+
+log = structlog.get_logger()
+
+# Warmup iterations on a side stream before capture, as CUDA graphs require
+WARMUP_STEPS = 3
+
+
+def sample_next_token(logits: torch.Tensor, temperature: float, top_k: int, top_p: float) -> torch.Tensor:
+    """Pick the next token id from last-position logits of shape (1, vocab)
+
+    Greedy when temperature is zero, otherwise top-k then top-p (nucleus) sampling.
+    """
+    if temperature <= 0:
+        return torch.argmax(logits, dim=-1, keepdim=True)
+
+    logits = logits / temperature
+
+    if top_k > 0:
+        kth_largest = torch.topk(logits, min(top_k, logits.shape[-1])).values[..., -1:]
+        logits = logits.masked_fill(logits < kth_largest, float('-inf'))
+
+    if top_p < 1.0:
+        sorted_logits, sorted_indices = torch.sort(logits, descending=True)
+        sorted_probs = torch.softmax(sorted_logits, dim=-1)
+        # Drop tokens once the probability mass before them already exceeds top_p
+        remove = (sorted_probs.cumsum(dim=-1) - sorted_probs) > top_p
+        sorted_logits = sorted_logits.masked_fill(remove, float('-inf'))
+        logits = torch.full_like(logits, float('-inf')).scatter(-1, sorted_indices, sorted_logits)
+
+    return torch.multinomial(torch.softmax(logits, dim=-1), num_samples=1)
+
+
+class CudaGraphDecoder:
+    """Batch-size-1 decoding that replays one captured forward pass per token
+
+    The model's KV cache is replaced by transformers' StaticCache, whose
+    tensors have a fixed shape and address and are updated in place, so the
+    single-token forward can be captured once and replayed for every step.
+    The prompt prefill still runs eagerly.
+    """
+
+    def __init__(self, model, max_cache_len: int):
+        self.model = model
+        self.max_cache_len = max_cache_len
+        self.lock = threading.Lock()
+
+        model._setup_cache(StaticCache, max_batch_size=1, max_cache_len=max_cache_len)
+
+        device = model.device
+        self.static_input_ids = torch.zeros((1, 1), dtype=torch.long, device=device)
+        self.static_position_ids = torch.zeros((1, 1), dtype=torch.long, device=device)
+        self.static_cache_position = torch.zeros((1,), dtype=torch.long, device=device)
+        self.static_logits: Optional[torch.Tensor] = None
+        self.graph: Optional[torch.cuda.CUDAGraph] = None
+
+    @staticmethod
+    def supports(model) -> bool:
+        """Whether the model can decode from a static cache on a single GPU"""
+        device_map = getattr(model, 'hf_device_map', None) or {}
+        return (
+            getattr(model, '_supports_static_cache', False)
+            and hasattr(model, '_setup_cache')
+            and model.config._attn_implementation != "flash_attention_2"
+            and len(set(device_map.values())) <= 1
+        )
+
+    def _decode_step(self) -> torch.Tensor:
+        return self.model(
+            input_ids=self.static_input_ids,
+            position_ids=self.static_position_ids,
+            cache_position=self.static_cache_position,
+            use_cache=True,
+            return_dict=False
+        )[0]
+
+    def _capture(self):
+        log.info("Capturing decode step CUDA graph", max_cache_len=self.max_cache_len)
+
+        # Warmup writes into cache slot 0, which the next prefill overwrites
+        side_stream = torch.cuda.Stream()
+        side_stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(side_stream):
+            for _ in range(WARMUP_STEPS):
+                self._decode_step()
+        torch.cuda.current_stream().wait_stream(side_stream)
+
+        self.graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(self.graph):
+            self.static_logits = self._decode_step()
+
+    @torch.no_grad()
+    def generate(
+        self,
+        input_ids: torch.Tensor,
+        max_new_tokens: int,
+        eos_token_ids: Iterable[int],
+        temperature: float,
+        top_k: int = 50,
+        top_p: float = 0.95,
+        streamer=None
+    ) -> torch.Tensor:
+        """Generate up to max_new_tokens after input_ids; returns prompt + generated ids
+
+        Mirrors generate()'s streamer protocol: the prompt is put first, then
+        each new token, then end().
+        """
+        with self.lock:
+            if self.graph is None:
+                self._capture()
+
+            prompt_length = input_ids.shape[1]
+            max_new_tokens = min(max_new_tokens, self.max_cache_len - prompt_length)
+            eos_token_ids = set(eos_token_ids)
+
+            if streamer is not None:
+                streamer.put(input_ids.cpu())
+
+            # Stale cache entries past the prompt are masked out by cache_position
+            logits = self.model(
+                input_ids=input_ids,
+                cache_position=torch.arange(prompt_length, device=input_ids.device),
+                use_cache=True,
+                return_dict=False
+            )[0]
+            next_token = sample_next_token(logits[:, -1, :], temperature, top_k, top_p)
+
+            generated = []
+            for step in range(max_new_tokens):
+                generated.append(next_token)
+                if streamer is not None:
+                    streamer.put(next_token.cpu())
+
+                if next_token.item() in eos_token_ids or step == max_new_tokens - 1:
+                    break
+
+                position = prompt_length + step
+                self.static_input_ids.copy_(next_token)
+                self.static_position_ids.fill_(position)
+                self.static_cache_position.fill_(position)
+                self.graph.replay()
+
+                next_token = sample_next_token(self.static_logits[:, -1, :], temperature, top_k, top_p)
+
+            if streamer is not None:
+                streamer.end()
+
+            return torch.cat([input_ids, *generated], dim=1)
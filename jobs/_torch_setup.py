@@ -0,0 +1,31 @@
+"""Process-wide PyTorch backend settings shared by all job types
+
+Imported first by the jobs package so every job runs with the same
+settings. TF32 tensor cores are only used for GEMMs whose dimensions are
+multiples of 8, so keep batch/hidden sizes aligned to 8 where possible.
+"""
+
+import os
+
+# The caching allocator reads its config when CUDA initialises, so this has
+# to be in place before torch is imported. Expandable segments let long-lived
+# workers grow/shrink blocks instead of fragmenting across jobs.
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True,max_split_size_mb:512")
+
+import torch  # noqa: E402
+
+# Run FP32 matmuls and convolutions on TF32 tensor cores
+torch.set_float32_matmul_precision("high")
+torch.backends.cuda.matmul.allow_tf32 = True
+torch.backends.cudnn.allow_tf32 = True
+
+# Benchmark cuDNN algorithms once per input shape and cache the fastest
+torch.backends.cudnn.benchmark = True
+
+# Leave headroom for the driver and other processes on the GPU. Jobs allocate
+# on the current device ("cuda" / index 0), so that is the one capped
+if torch.cuda.is_available():
+    torch.cuda.set_per_process_memory_fraction(
+        max(0.1, min(float(os.getenv("CUDA_MEMORY_FRACTION", "0.9")), 1.0)),
+        device=torch.cuda.current_device()
+    )
@@ -1,11 +1,17 @@
 """Base class for job execution"""
 
+import os
 from abc import ABC, abstractmethod
 from typing import Dict, Any
+from urllib.parse import urlparse
+
+import aiohttp
 import structlog
 
 log = structlog.get_logger()
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 class BaseJob(ABC):
     """Base class for all job types"""
@@ -17,8 +23,12 @@ class BaseJob(ABC):
         self.config = job_data.get('config', {})
 
     @abstractmethod
-    def execute(self) -> Dict[str, Any]:
-        """Execute the job and return results"""
+    async def execute(self) -> Dict[str, Any]:
+        """Execute the job and return results
+
+        Downloads and uploads are awaited directly; blocking GPU work runs
+        via asyncio.to_thread so other jobs' transfers overlap with it.
+        """
         pass
 
     def validate(self) -> bool:
@@ -28,6 +38,23 @@ class BaseJob(ABC):
             return False
         return True
 
+    async def download_file(self, url: str, dest_dir: str) -> str:
+        """Stream a remote input file into dest_dir and return its local path"""
+        os.makedirs(dest_dir, exist_ok=True)
+        filename = os.path.basename(urlparse(url).path) or 'input'
+        path = os.path.join(dest_dir, f"{self.job_id}-{filename}")
+
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=60)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                with open(path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+
+        log.info("Input downloaded", url=url, path=path)
+        return path
+
     def cleanup(self):
         """Clean up resources after job execution"""
         pass
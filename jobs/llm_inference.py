@@ -1,14 +1,153 @@
 """LLM Inference Job Execution"""
 
+import asyncio
+import gc
+import os
+import queue
+import threading
+from collections import OrderedDict
+
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
-from typing import Dict, Any
+from transformers import (
+    AutoModelForCausalLM,
+    AutoTokenizer,
+    BitsAndBytesConfig,
+    PreTrainedTokenizerBase,
+    TextIteratorStreamer,
+)
+from typing import Dict, Any, Callable, Optional, Tuple
 import structlog
 
 from .base import BaseJob
+from ._attention import resolve_attn_implementation
+from ._cuda_graph import CudaGraphDecoder
+
+try:
+    from vllm import LLM, SamplingParams
+    from vllm.model_executor.parallel_utils.parallel_state import destroy_model_parallel
+except ImportError:
+    LLM = None
+    SamplingParams = None
+    destroy_model_parallel = None
 
 log = structlog.get_logger()
 
+BACKENDS = ('vllm', 'transformers')
+QUANTIZATIONS = ('int8', 'nf4')
+
+# Loaded (model, draft_model, graph_decoder, lock) entries reused across jobs on this worker,
+# keyed by (model_name, backend, dtype, quantization, compile, draft, cuda_graph) in
+# least-recently-used order. A vLLM engine reserves most of the GPU, so it is always
+# the only entry; its lock serializes generate() since LLM is not thread-safe
+_MODEL_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_MODEL_CACHE_SIZE = max(1, min(int(os.getenv("MAX_JOBS_CONCURRENT", "1")), 10))
+_MODEL_CACHE_LOCK = threading.Lock()
+# Number of running jobs using each cached entry. Pinned entries are never
+# evicted: tearing down an engine or model mid-generate breaks that job, and
+# evicting one still referenced frees no VRAM for the load that needed it
+_MODEL_PINS: Dict[tuple, int] = {}
+# Notified when a pin is dropped, for loads waiting on room in the cache
+_MODEL_UNPINNED = threading.Condition(_MODEL_CACHE_LOCK)
+
+# Tokenizers are small, so they are kept for every model seen rather than evicted.
+# Each is shared with a lock: the Rust backend raises "Already borrowed" when one
+# thread encodes (padding/truncation mutate it) while another decodes
+_TOKENIZER_CACHE: Dict[str, Tuple[PreTrainedTokenizerBase, threading.Lock]] = {}
+_TOKENIZER_CACHE_LOCK = threading.Lock()
+
+# How often the decode thread re-checks that generation is still running
+# while waiting for the next token (the first can take minutes on CPU or recompile)
+STREAM_POLL_SECONDS = 5
+
+# Static KV cache length for CUDA graph decoding (prompt + generated tokens)
+CUDA_GRAPH_CACHE_LEN = 2048
+
+
+def _default_quantization() -> Optional[str]:
+    """Pick a weight quantization that lets a 7B model fit in the GPU's VRAM"""
+    if not torch.cuda.is_available():
+        return None
+
+    vram_mb = torch.cuda.get_device_properties(0).total_memory // (1024 * 1024)
+
+    if vram_mb < 10000:
+        return 'nf4'
+    elif vram_mb < 16000:
+        return 'int8'
+    return None
+
+
+def _release_vllm(engine):
+    """Tear down a vLLM engine so its reserved GPU memory is actually returned"""
+    # Dropping the LLM object alone leaves the worker, its KV cache blocks and
+    # the model-parallel groups alive
+    if destroy_model_parallel is not None:
+        destroy_model_parallel()
+    executor = getattr(engine.llm_engine, 'model_executor', None)
+    if executor is not None and hasattr(executor, 'driver_worker'):
+        del executor.driver_worker
+    del engine
+    gc.collect()
+    if torch.distributed.is_initialized():
+        torch.distributed.destroy_process_group()
+
+
+def _evict_cached_model() -> bool:
+    """Drop the least recently used unpinned model and free its GPU memory
+
+    Returns False if every cached model is in use by a running job.
+    """
+    evicted_key = next((key for key in _MODEL_CACHE if not _MODEL_PINS.get(key)), None)
+    if evicted_key is None:
+        return False
+
+    evicted = _MODEL_CACHE.pop(evicted_key)
+    log.info("Evicting cached model", model=evicted_key[0])
+
+    if evicted_key[1] == 'vllm':
+        _release_vllm(evicted[0])
+    del evicted
+    gc.collect()
+
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    return True
+
+
+class _LockedTextIteratorStreamer(TextIteratorStreamer):
+    """TextIteratorStreamer that decodes under the shared tokenizer's lock"""
+
+    def __init__(self, tokenizer, tokenizer_lock: threading.Lock, **kwargs):
+        super().__init__(tokenizer, **kwargs)
+        self.tokenizer_lock = tokenizer_lock
+
+    def put(self, value):
+        with self.tokenizer_lock:
+            super().put(value)
+
+    def end(self):
+        with self.tokenizer_lock:
+            super().end()
+
+
+def _get_tokenizer(model_name: str) -> Tuple[PreTrainedTokenizerBase, threading.Lock]:
+    """Return the shared fast (Rust) tokenizer for model_name and the lock guarding it"""
+    with _TOKENIZER_CACHE_LOCK:
+        cached = _TOKENIZER_CACHE.get(model_name)
+
+        if cached is None:
+            tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True, trust_remote_code=True)
+            # Left padding keeps every prompt flush against its generated tokens
+            # when batching; left truncation keeps the end of over-long prompts
+            tokenizer.padding_side = "left"
+            tokenizer.truncation_side = "left"
+            if tokenizer.pad_token is None and tokenizer.eos_token is not None:
+                tokenizer.pad_token = tokenizer.eos_token
+            cached = (tokenizer, threading.Lock())
+            _TOKENIZER_CACHE[model_name] = cached
+
+    return cached
+
 
 class LLMInferenceJob(BaseJob):
     """Execute LLM inference jobs"""
@@ -19,8 +158,39 @@ class LLMInferenceJob(BaseJob):
         self.prompt = self.input_data.get('prompt', '')
         self.max_tokens = self.config.get('max_tokens', 512)
         self.temperature = self.config.get('temperature', 0.7)
+        # Only applies to the transformers backend; 'none' forces FP16 weights
+        self.quantization = self.config.get('quantization', _default_quantization())
+        if self.quantization == 'none':
+            self.quantization = None
+        # vLLM (paged KV cache) is preferred whenever it can run; transformers
+        # remains the fallback for CPU-only nodes, machines without vllm, and
+        # quantized (low-VRAM) loads, since vLLM would load FP16 weights
+        if LLM is not None and torch.cuda.is_available() and self.quantization is None:
+            default_backend = 'vllm'
+        else:
+            default_backend = 'transformers'
+        self.backend = self.config.get('backend', default_backend)
+        # Some models silently fall back to eager under torch.compile; allow opting out
+        self.compile_model = self.config.get('compile', True)
+        # Small model of the same family used for speculative decoding (transformers backend)
+        self.draft_model_name = self.config.get('draft_model')
+        # Replay the decode step as one captured CUDA graph (transformers backend,
+        # batch size 1); takes the place of torch.compile for this model
+        self.cuda_graph = self.config.get('cuda_graph', False)
+        self.engine = None
+        self.engine_lock = None
         self.model = None
         self.tokenizer = None
+        self.tokenizer_lock = None
+        self.draft_model = None
+        self.graph_decoder = None
+        # Cache key this job holds a pin on while it uses the model
+        self._pinned_key = None
+        # Side stream so prompt H2D copies overlap with launch prep on the default stream
+        self.copy_stream = torch.cuda.Stream() if torch.cuda.is_available() else None
+        # Optional hook called with each decoded text fragment as it is generated
+        # (transformers backend), e.g. to forward tokens to the backend over a WebSocket
+        self.on_text: Optional[Callable[[str], None]] = None
 
     def validate(self) -> bool:
         if not super().validate():
@@ -30,63 +200,410 @@ class LLMInferenceJob(BaseJob):
             log.error("Prompt is required for LLM inference")
             return False
 
+        if self.backend not in BACKENDS:
+            log.error("Unknown inference backend", backend=self.backend)
+            return False
+
+        if self.backend == 'vllm' and LLM is None:
+            log.error("vLLM backend requested but vllm is not installed")
+            return False
+
+        if self.quantization is not None:
+            if self.quantization not in QUANTIZATIONS:
+                log.error("Unknown quantization", quantization=self.quantization)
+                return False
+
+            if not torch.cuda.is_available():
+                log.error("Quantized inference requires a CUDA GPU", quantization=self.quantization)
+                return False
+
+        if self.cuda_graph and self.draft_model_name:
+            log.error("CUDA graph decoding does not support speculative decoding")
+            return False
+
+        if self.cuda_graph and self.max_tokens >= CUDA_GRAPH_CACHE_LEN:
+            log.error(
+                "max_tokens leaves no room for the prompt in the CUDA graph KV cache",
+                max_tokens=self.max_tokens,
+                cache_len=CUDA_GRAPH_CACHE_LEN
+            )
+            return False
+
         return True
 
+    def _quantization_config(self) -> Optional[BitsAndBytesConfig]:
+        """Build the bitsandbytes config for the requested quantization"""
+        if self.quantization == 'int8':
+            # A zero threshold keeps every column on the int8 kernel instead
+            # of splitting outliers out to the slow fp16 path
+            return BitsAndBytesConfig(load_in_8bit=True, llm_int8_threshold=0.0)
+
+        if self.quantization == 'nf4':
+            compute_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+            return BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_compute_dtype=compute_dtype
+            )
+
+        return None
+
+    def _cache_key(self) -> tuple:
+        dtype_key = "float16" if torch.cuda.is_available() else "float32"
+        return (
+            self.model_name, self.backend, dtype_key,
+            self.quantization, self.compile_model, self.draft_model_name, self.cuda_graph
+        )
+
     def load_model(self):
-        """Load model and tokenizer"""
-        log.info("Loading model", model=self.model_name)
+        """Load model and tokenizer, reusing them from earlier jobs when possible
+
+        The cache entry stays pinned until release_model().
+        """
+        key = self._cache_key()
+
+        with _MODEL_CACHE_LOCK:
+            while True:
+                cached = _MODEL_CACHE.get(key)
+
+                if cached is not None:
+                    _MODEL_CACHE.move_to_end(key)
+                    log.info("Reusing cached model", model=self.model_name, backend=self.backend)
+                    break
+
+                # Free VRAM before loading rather than after. A vLLM engine
+                # can't share the GPU, so loading one (or anything next to one)
+                # empties the cache first
+                if not _MODEL_CACHE or not (
+                    len(_MODEL_CACHE) >= _MODEL_CACHE_SIZE
+                    or self.backend == 'vllm'
+                    or any(cached_key[1] == 'vllm' for cached_key in _MODEL_CACHE)
+                ):
+                    if self.backend == 'vllm':
+                        cached = (self._load_vllm(), None, None, threading.Lock())
+                    else:
+                        cached = (*self._load_transformers(), None)
+                    _MODEL_CACHE[key] = cached
+                    break
+
+                if not _evict_cached_model():
+                    log.info("Waiting for a running job to release a cached model", model=self.model_name)
+                    _MODEL_UNPINNED.wait()
+
+            _MODEL_PINS[key] = _MODEL_PINS.get(key, 0) + 1
+            self._pinned_key = key
+
+        if self.backend == 'vllm':
+            self.engine, _, _, self.engine_lock = cached
+        else:
+            self.model, self.draft_model, self.graph_decoder, _ = cached
+            self.tokenizer, self.tokenizer_lock = _get_tokenizer(self.model_name)
+
+    def _load_vllm(self):
+        """Start a vLLM engine for the model"""
+        log.info("Loading model", model=self.model_name, backend=self.backend)
+
+        # vLLM sizes its KV cache from free device memory, which does not count
+        # blocks sitting in PyTorch's cache from earlier jobs
+        torch.cuda.empty_cache()
+
+        engine = LLM(
+            model=self.model_name,
+            dtype="float16",
+            gpu_memory_utilization=0.9,
+            enable_prefix_caching=True,
+            trust_remote_code=True
+        )
+
+        log.info("Model loaded successfully")
+        return engine
+
+    def _load_transformers(self) -> tuple:
+        """Load a transformers model with its draft model or CUDA graph decoder"""
+        log.info("Loading model", model=self.model_name, backend=self.backend)
 
         # Check if CUDA is available
         device = "cuda" if torch.cuda.is_available() else "cpu"
         log.info("Using device", device=device)
 
-        # Load tokenizer
-        self.tokenizer = AutoTokenizer.from_pretrained(
-            self.model_name,
-            trust_remote_code=True
-        )
+        tokenizer, tokenizer_lock = _get_tokenizer(self.model_name)
 
         # Load model
-        self.model = AutoModelForCausalLM.from_pretrained(
-            self.model_name,
-            torch_dtype=torch.float16 if device == "cuda" else torch.float32,
-            device_map="auto",
-            trust_remote_code=True
-        )
+        model_kwargs = {'device_map': "auto", 'trust_remote_code': True}
+
+        quantization_config = self._quantization_config()
+        if quantization_config is not None:
+            log.info("Loading quantized weights", quantization=self.quantization)
+            model_kwargs['quantization_config'] = quantization_config
+        else:
+            model_kwargs['torch_dtype'] = torch.float16 if device == "cuda" else torch.float32
+
+        attn_implementation = resolve_attn_implementation(self.model_name)
+        # The static KV cache in transformers only works with the SDPA/eager kernels
+        if self.cuda_graph and attn_implementation == "flash_attention_2":
+            attn_implementation = "sdpa"
+        if attn_implementation is not None:
+            log.info("Using attention kernel", attn_implementation=attn_implementation)
+            model_kwargs['attn_implementation'] = attn_implementation
+
+        model = AutoModelForCausalLM.from_pretrained(self.model_name, **model_kwargs)
+
+        model.eval()
+
+        graph_decoder = self._load_graph_decoder(model) if self.cuda_graph else None
+
+        if self.compile_model and device == "cuda" and graph_decoder is None:
+            # generate() calls the module's own forward, so compile that rather
+            # than wrapping the model (the wrapper's generate would stay eager).
+            # Default mode, not reduce-overhead: inductor's CUDA graph trees are
+            # thread-local, and jobs run on whichever pool thread picks them up
+            # (the cuda_graph option replays one captured graph instead)
+            model.forward = torch.compile(model.forward, fullgraph=False)
+            self._warmup(model, tokenizer, tokenizer_lock)
+
+        draft_model = self._load_draft_model(model) if self.draft_model_name else None
 
-        self.model.eval()
         log.info("Model loaded successfully")
+        return model, draft_model, graph_decoder
+
+    def _load_graph_decoder(self, model) -> Optional[CudaGraphDecoder]:
+        """Set up CUDA graph decoding, or None to fall back to generate()"""
+        if not torch.cuda.is_available() or self.quantization is not None:
+            log.warning("CUDA graph decoding needs unquantized weights on a GPU, using generate()")
+            return None
+
+        if not CudaGraphDecoder.supports(model):
+            log.warning("Model has no static KV cache support, using generate()", model=self.model_name)
+            return None
+
+        context_length = getattr(model.config, 'max_position_embeddings', None) or CUDA_GRAPH_CACHE_LEN
+        return CudaGraphDecoder(model, max_cache_len=min(context_length, CUDA_GRAPH_CACHE_LEN))
+
+    def _load_draft_model(self, model):
+        """Load the speculative decoding draft, or None if it can't assist this model"""
+        log.info("Loading draft model", draft_model=self.draft_model_name)
 
-    def execute(self) -> Dict[str, Any]:
-        """Execute LLM inference"""
         try:
-            if not self.validate():
-                return {'success': False, 'error': 'Validation failed'}
+            draft_model = AutoModelForCausalLM.from_pretrained(
+                self.draft_model_name,
+                torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
+                device_map="auto",
+                trust_remote_code=True
+            )
+        except Exception as e:
+            log.warning("Draft model unavailable, decoding without it", error=str(e))
+            return None
+
+        # Draft tokens are verified by id, so both models must share a vocabulary
+        if draft_model.config.vocab_size != model.config.vocab_size:
+            log.warning(
+                "Draft model vocabulary does not match, decoding without it",
+                draft_vocab=draft_model.config.vocab_size,
+                model_vocab=model.config.vocab_size
+            )
+            return None
+
+        draft_model.eval()
+        return draft_model
+
+    def _warmup(self, model, tokenizer, tokenizer_lock: threading.Lock):
+        """Run a one-token generation so compilation happens before timing"""
+        log.info("Warming up compiled model")
+        with tokenizer_lock:
+            warmup_inputs = tokenizer(self.prompt, return_tensors="pt")
+        warmup_inputs = warmup_inputs.to("cuda")
+
+        with torch.no_grad():
+            model.generate(**warmup_inputs, max_new_tokens=1)
+
+    def _generate_vllm(self) -> Tuple[str, int]:
+        """Generate with vLLM's paged-attention engine"""
+        sampling_params = SamplingParams(
+            temperature=self.temperature,
+            top_p=0.95,
+            top_k=50,
+            max_tokens=self.max_tokens,
+        )
+
+        with self.engine_lock:
+            outs = self.engine.generate([self.prompt], sampling_params)
+        completion = outs[0].outputs[0]
+
+        return completion.text, len(completion.token_ids)
+
+    def release_model(self):
+        """Unpin this job's cache entry so it can be evicted again"""
+        if self._pinned_key is None:
+            return
+
+        with _MODEL_CACHE_LOCK:
+            _MODEL_PINS[self._pinned_key] -= 1
+            if not _MODEL_PINS[self._pinned_key]:
+                del _MODEL_PINS[self._pinned_key]
+            self._pinned_key = None
+            _MODEL_UNPINNED.notify_all()
+
+    def _to_cuda(self, encoding) -> Dict[str, torch.Tensor]:
+        """Copy tokenized inputs to the GPU asynchronously from pinned host memory"""
+        with torch.cuda.stream(self.copy_stream):
+            tensors = {
+                name: tensor.pin_memory().to("cuda", non_blocking=True)
+                for name, tensor in encoding.items()
+            }
+
+        current_stream = torch.cuda.current_stream()
+        current_stream.wait_stream(self.copy_stream)
+        # The tensors were allocated on the copy stream but are consumed on this one
+        for tensor in tensors.values():
+            tensor.record_stream(current_stream)
 
-            # Load model
-            self.load_model()
+        return tensors
 
-            # Tokenize input
-            inputs = self.tokenizer(self.prompt, return_tensors="pt")
+    def _max_prompt_tokens(self) -> Optional[int]:
+        """Longest prompt that leaves room for max_tokens, if the context size is known"""
+        if self.graph_decoder is not None:
+            # Keep the whole prompt the cache can hold; generation is clamped to
+            # the room left instead (see _graph_max_new_tokens)
+            return self.graph_decoder.max_cache_len - 1
 
-            if torch.cuda.is_available():
-                inputs = inputs.to("cuda")
+        context_length = getattr(self.model.config, 'max_position_embeddings', None)
+        if context_length is None:
+            return None
+        return max(1, context_length - self.max_tokens)
 
-            # Generate
-            log.info("Generating response", max_tokens=self.max_tokens)
+    def _graph_max_new_tokens(self, prompt_length: int) -> int:
+        """max_tokens clamped to the room the static KV cache has after the prompt"""
+        room = self.graph_decoder.max_cache_len - prompt_length
+        if room < self.max_tokens:
+            log.warning(
+                "Prompt leaves too little KV cache room, generating fewer tokens",
+                max_tokens=self.max_tokens,
+                max_new_tokens=room,
+                prompt_tokens=prompt_length
+            )
+        return min(self.max_tokens, room)
 
+    def _eos_token_ids(self) -> list:
+        """Token ids that end generation, from the generation config or tokenizer"""
+        eos_token_id = self.model.generation_config.eos_token_id
+        if eos_token_id is None:
+            eos_token_id = self.tokenizer.eos_token_id
+        if eos_token_id is None:
+            return []
+        return eos_token_id if isinstance(eos_token_id, list) else [eos_token_id]
+
+    def _generate_transformers(self) -> Tuple[str, int]:
+        """Generate with HuggingFace transformers"""
+        # Tokenize input, truncating so the prompt and max_tokens fit in the context window
+        max_length = self._max_prompt_tokens()
+        with self.tokenizer_lock:
+            inputs = self.tokenizer(
+                [self.prompt],
+                padding=True,
+                truncation=max_length is not None,
+                max_length=max_length,
+                return_tensors="pt"
+            )
+
+        if torch.cuda.is_available():
+            inputs = self._to_cuda(inputs)
+
+        generate_kwargs = {
+            'max_new_tokens': self.max_tokens,
+            'use_cache': True,
+        }
+
+        # Zero temperature means greedy decoding, which also makes speculative
+        # acceptance deterministic
+        if self.temperature > 0:
+            generate_kwargs.update(do_sample=True, temperature=self.temperature, top_p=0.95, top_k=50)
+        else:
+            generate_kwargs['do_sample'] = False
+
+        if self.draft_model is not None:
+            generate_kwargs['assistant_model'] = self.draft_model
+
+        # Decode incrementally on a helper thread so detokenization overlaps
+        # with the forward passes; generate itself stays on this job's thread
+        streamer = _LockedTextIteratorStreamer(
+            self.tokenizer,
+            self.tokenizer_lock,
+            skip_prompt=True,
+            skip_special_tokens=True,
+            timeout=STREAM_POLL_SECONDS
+        )
+        fragments = []
+        generation_done = threading.Event()
+        decode_errors = []
+
+        def decode_stream():
+            try:
+                while True:
+                    try:
+                        fragment = next(streamer)
+                    except queue.Empty:
+                        # No token yet; keep waiting as long as generation is running
+                        if generation_done.is_set():
+                            break
+                        continue
+                    except StopIteration:
+                        break
+
+                    fragments.append(fragment)
+                    if self.on_text is not None:
+                        self.on_text(fragment)
+            except Exception as e:
+                decode_errors.append(e)
+
+        decode_thread = threading.Thread(target=decode_stream, daemon=True)
+        decode_thread.start()
+
+        try:
             with torch.no_grad():
-                outputs = self.model.generate(
-                    **inputs,
-                    max_new_tokens=self.max_tokens,
-                    temperature=self.temperature,
-                    do_sample=True,
-                    top_p=0.95,
-                    top_k=50,
-                )
-
-            # Decode output
-            generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+                if self.graph_decoder is not None:
+                    sequences = self.graph_decoder.generate(
+                        inputs['input_ids'],
+                        max_new_tokens=self._graph_max_new_tokens(inputs['input_ids'].shape[1]),
+                        eos_token_ids=self._eos_token_ids(),
+                        temperature=self.temperature,
+                        streamer=streamer
+                    )
+                else:
+                    sequences = self.model.generate(**inputs, **generate_kwargs, streamer=streamer)
+        except Exception:
+            # Stop the decode thread now rather than at its next poll
+            streamer.end()
+            raise
+        finally:
+            generation_done.set()
+            decode_thread.join()
+
+        if decode_errors:
+            raise decode_errors[0]
+
+        tokens_generated = sequences.shape[1] - inputs['input_ids'].shape[1]
+        return ''.join(fragments), tokens_generated
+
+    def _infer(self) -> Tuple[str, int]:
+        """Load the model and generate (blocking)"""
+        self.load_model()
+
+        try:
+            log.info("Generating response", max_tokens=self.max_tokens, backend=self.backend)
+
+            if self.backend == 'vllm':
+                return self._generate_vllm()
+            return self._generate_transformers()
+        finally:
+            self.release_model()
+
+    async def execute(self) -> Dict[str, Any]:
+        """Execute LLM inference"""
+        try:
+            if not self.validate():
+                return {'success': False, 'error': 'Validation failed'}
+
+            generated_text, tokens_generated = await asyncio.to_thread(self._infer)
 
             log.info("Inference completed successfully")
 
@@ -94,7 +611,7 @@ class LLMInferenceJob(BaseJob):
                 'success': True,
                 'output': generated_text,
                 'model': self.model_name,
-                'tokens_generated': len(outputs[0])
+                'tokens_generated': tokens_generated
             }
 
         except Exception as e:
@@ -105,13 +622,16 @@ class LLMInferenceJob(BaseJob):
             }
 
     def cleanup(self):
-        """Clean up model from memory"""
-        if self.model:
-            del self.model
-        if self.tokenizer:
-            del self.tokenizer
-
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
+        """Release this job's references; the model stays cached for later jobs"""
+        self.release_model()
+        self.engine = None
+        self.engine_lock = None
+        self.model = None
+        self.tokenizer = None
+        self.tokenizer_lock = None
+        self.draft_model = None
+        self.graph_decoder = None
 
+        # Freed blocks stay in PyTorch's cache for the next job; VRAM is only
+        # handed back to the driver when a cached model is evicted
         log.info("Cleanup completed")
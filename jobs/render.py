@@ -16,6 +16,7 @@ class RenderJob(BaseJob):
         self.render_type = self.input_data.get('type', 'blender')  # blender, video_transcode
         self.scene_url = self.input_data.get('scene_url', '')
         self.output_format = self.config.get('output_format', 'png')
+        self.output_dir = self.config.get('output_dir', '/app/data')
 
     def validate(self) -> bool:
         if not super().validate():
@@ -27,7 +28,7 @@ class RenderJob(BaseJob):
 
         return True
 
-    def execute(self) -> Dict[str, Any]:
+    async def execute(self) -> Dict[str, Any]:
         """Execute rendering"""
         try:
             if not self.validate():
@@ -35,9 +36,11 @@ class RenderJob(BaseJob):
 
             log.info("Starting render", type=self.render_type)
 
+            scene_path = await self.download_file(self.scene_url, self.output_dir)
+
             # TODO: Implement rendering
-            # - Download scene file
-            # - Execute render (Blender, FFmpeg, etc.)
+            # - Execute render on scene_path (Blender, FFmpeg, etc.) via
+            #   asyncio.create_subprocess_exec so the event loop stays free
             # - Upload result
 
             log.info("Render completed")
@@ -1,39 +1,97 @@
 """Configuration management for Hypernode worker"""
 
+import functools
 import os
-from dataclasses import dataclass, field
+from dataclasses import dataclass
+
+import httpx
 from dotenv import load_dotenv
-from typing import Optional
 
 load_dotenv()
 
+# Environment is read once at import; get_config() parses and validates it
+_NODE_TOKEN = os.getenv("HN_NODE_TOKEN", "")
+_WALLET_PUBKEY = os.getenv("WALLET_PUBKEY", "")
+_BACKEND_URL = os.getenv("BACKEND_URL", "https://api.hypernode.sol")
+_HEARTBEAT_INTERVAL = os.getenv("HEARTBEAT_INTERVAL", "60")
+_MAX_JOBS_CONCURRENT = os.getenv("MAX_JOBS_CONCURRENT", "1")
+_GPU_INDEX = os.getenv("GPU_INDEX", "0")
+_LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+_REQUEST_TIMEOUT = os.getenv("REQUEST_TIMEOUT", "30")
+_JOB_POLL_INTERVAL = os.getenv("JOB_POLL_INTERVAL", "10")
+
+USER_AGENT = "hypernode-node-client/1.0"
+# Connection-level retries; request-level retries are left to retry_with_backoff
+CONNECT_RETRIES = 3
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class Config:
     """Worker configuration from environment variables"""
 
-    node_token: str = field(default_factory=lambda: os.getenv("HN_NODE_TOKEN", ""))
-    wallet_pubkey: str = field(default_factory=lambda: os.getenv("WALLET_PUBKEY", ""))
-    backend_url: str = field(default_factory=lambda: os.getenv("BACKEND_URL", "https://api.hypernode.sol"))
-    heartbeat_interval: int = field(default_factory=lambda: max(10, min(int(os.getenv("HEARTBEAT_INTERVAL", "60")), 600)))
-    max_jobs_concurrent: int = field(default_factory=lambda: max(1, min(int(os.getenv("MAX_JOBS_CONCURRENT", "1")), 10)))
-    gpu_index: int = field(default_factory=lambda: max(0, int(os.getenv("GPU_INDEX", "0"))))
-    log_level: str = field(default_factory=lambda: os.getenv("LOG_LEVEL", "INFO"))
-    request_timeout: int = field(default_factory=lambda: max(5, min(int(os.getenv("REQUEST_TIMEOUT", "30")), 300)))
-    job_poll_interval: int = field(default_factory=lambda: max(5, min(int(os.getenv("JOB_POLL_INTERVAL", "10")), 60)))
-
-    def validate(self) -> tuple[bool, Optional[str]]:
-        """Validate configuration values"""
+    node_token: str
+    wallet_pubkey: str
+    backend_url: str
+    heartbeat_interval: int
+    max_jobs_concurrent: int
+    gpu_index: int
+    log_level: str
+    request_timeout: int
+    job_poll_interval: int
+
+    def validate(self):
+        """Validate configuration values, raising ValueError on the first problem"""
         if not self.node_token:
-            return False, "HN_NODE_TOKEN is required"
+            raise ValueError("HN_NODE_TOKEN is required")
 
         if not self.wallet_pubkey or len(self.wallet_pubkey) < 32:
-            return False, "WALLET_PUBKEY is required and must be valid Solana address"
+            raise ValueError("WALLET_PUBKEY is required and must be valid Solana address")
 
         if not self.backend_url.startswith(("http://", "https://")):
-            return False, "BACKEND_URL must start with http:// or https://"
+            raise ValueError("BACKEND_URL must start with http:// or https://")
 
         if self.heartbeat_interval < 10:
-            return False, "HEARTBEAT_INTERVAL must be at least 10 seconds"
+            raise ValueError("HEARTBEAT_INTERVAL must be at least 10 seconds")
+
+    def build_client(self) -> httpx.AsyncClient:
+        """Build the HTTP client shared by every component talking to the backend
+
+        Must be called from within the event loop that will use it.
+        """
+        # Keep-alive pooling lets polls, heartbeats and reports skip the TCP+TLS
+        # handshake, and HTTP/2 multiplexes them as concurrent streams on one
+        # connection, so a few connections cover the whole worker
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=4, max_connections=4),
+            retries=CONNECT_RETRIES
+        )
+        return httpx.AsyncClient(
+            transport=transport,
+            headers={
+                "Authorization": f"Bearer {self.node_token}",
+                "User-Agent": USER_AGENT,
+            },
+            timeout=self.request_timeout
+        )
+
+
+@functools.lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Build and validate the worker configuration once per process
 
-        return True, None
+    Raises ValueError if the environment holds an invalid configuration.
+    """
+    config = Config(
+        node_token=_NODE_TOKEN,
+        wallet_pubkey=_WALLET_PUBKEY,
+        backend_url=_BACKEND_URL,
+        heartbeat_interval=max(10, min(int(_HEARTBEAT_INTERVAL), 600)),
+        max_jobs_concurrent=max(1, min(int(_MAX_JOBS_CONCURRENT), 10)),
+        gpu_index=max(0, int(_GPU_INDEX)),
+        log_level=_LOG_LEVEL,
+        request_timeout=max(5, min(int(_REQUEST_TIMEOUT), 300)),
+        job_poll_interval=max(5, min(int(_JOB_POLL_INTERVAL), 60)),
+    )
+    config.validate()
+    return config
@@ -1,56 +1,109 @@
 """GPU detection and specification gathering"""
 
+import atexit
+import functools
+import pathlib
 import platform
 import psutil
 import structlog
-from typing import Dict, List
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import pynvml
+    _HAS_NVML = True
+except ImportError:
+    pynvml = None
+    _HAS_NVML = False
 
 log = structlog.get_logger()
 
 
+@dataclass(frozen=True, slots=True)
+class GpuInfo:
+    """Static GPU and host specifications reported at registration"""
+
+    model: str = "Unknown"
+    vram_mb: int = 0
+    driver_version: str = "Unknown"
+    # NVML reports the CUDA driver version as an integer, e.g. 12020
+    cuda_version: Union[int, str] = "Unknown"
+    os: str = "Unknown"
+    cpu_model: str = "Unknown"
+    ram_total_mb: int = 0
+    capabilities: Tuple[str, ...] = ()
+
+
+# GpuInfo field -> registration API key
+_REGISTRATION_KEYS = {
+    "model": "gpuModel",
+    "driver_version": "driverVersion",
+    "cuda_version": "cudaVersion",
+    "os": "hostOS",
+    "cpu_model": "cpuModel",
+    "ram_total_mb": "ramTotal",
+}
+
+
+def asdict_camel(info: GpuInfo) -> Dict[str, Any]:
+    """GpuInfo as the camelCase fields of the node registration payload"""
+    payload = {key: getattr(info, field) for field, key in _REGISTRATION_KEYS.items()}
+    payload["vram"] = info.vram_mb // 1024  # API expects GB
+    payload["capabilities"] = list(info.capabilities)
+    return payload
+
+
 class GPUDetector:
     """Detects GPU specifications and capabilities"""
 
-    def detect(self) -> Dict:
-        """Detect GPU and system specifications"""
-        gpu_info = {
-            "model": "Unknown",
-            "vram_mb": 0,
-            "driver_version": "Unknown",
-            "cuda_version": "Unknown",
-            "os": platform.system() + " " + platform.release(),
-            "cpu_model": self._get_cpu_model(),
-            "ram_total_mb": self._get_total_ram(),
-            "capabilities": []
-        }
+    def __init__(self, gpu_index: int = 0):
+        self.gpu_index = gpu_index
+        self._handle = None
+        # Static specs from the first detect(); only dynamic stats are queried afterwards
+        self.cached_static: Optional[GpuInfo] = None
 
-        # Try NVIDIA first
+        if not _HAS_NVML:
+            log.warning("pynvml not installed - NVIDIA GPU queries disabled")
+            return
+
+        # Initialise NVML once and keep the device handle for every later query
         try:
-            import pynvml
             pynvml.nvmlInit()
-            device_count = pynvml.nvmlDeviceGetCount()
+            atexit.register(pynvml.nvmlShutdown)
+            self._handle = pynvml.nvmlDeviceGetHandleByIndex(gpu_index)
+        except Exception as e:
+            log.warning("NVIDIA GPU not found or pynvml error", error=str(e))
 
-            if device_count > 0:
-                handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+    def detect(self) -> GpuInfo:
+        """Detect GPU and system specifications (queried once, then cached)"""
+        if self.cached_static is not None:
+            return self.cached_static
 
-                gpu_info["model"] = pynvml.nvmlDeviceGetName(handle).decode("utf-8")
+        gpu = {}
 
-                mem_info = pynvml.nvmlDeviceGetMemoryInfo(handle)
-                gpu_info["vram_mb"] = mem_info.total // (1024 * 1024)
+        # Try NVIDIA first
+        if self._handle is not None:
+            try:
+                model = pynvml.nvmlDeviceGetName(self._handle).decode("utf-8")
 
-                gpu_info["driver_version"] = pynvml.nvmlSystemGetDriverVersion().decode("utf-8")
-                gpu_info["cuda_version"] = pynvml.nvmlSystemGetCudaDriverVersion_v2()
+                mem_info = pynvml.nvmlDeviceGetMemoryInfo(self._handle)
+                vram_mb = mem_info.total // (1024 * 1024)
 
-                # Determine capabilities based on VRAM
-                vram_gb = gpu_info["vram_mb"] // 1024
-                gpu_info["capabilities"] = self._determine_capabilities(vram_gb)
+                gpu = {
+                    "model": model,
+                    "vram_mb": vram_mb,
+                    "driver_version": pynvml.nvmlSystemGetDriverVersion().decode("utf-8"),
+                    "cuda_version": pynvml.nvmlSystemGetCudaDriverVersion_v2(),
+                    # Determine capabilities based on VRAM
+                    "capabilities": tuple(self._determine_capabilities(vram_mb // 1024)),
+                }
 
-                pynvml.nvmlShutdown()
-                log.info("NVIDIA GPU detected", model=gpu_info["model"])
+                log.info("NVIDIA GPU detected", model=model)
 
-        except Exception as e:
-            log.warning("NVIDIA GPU not found or pynvml error", error=str(e))
+            except Exception as e:
+                log.warning("NVIDIA GPU query failed", error=str(e))
 
+        if not gpu:
             # Try AMD (ROCm)
             try:
                 # ROCm detection would go here
@@ -59,20 +112,27 @@ class GPUDetector:
                 pass
 
             # Fallback to CPU-only
-            if gpu_info["model"] == "Unknown":
-                gpu_info["model"] = "CPU-only (No GPU detected)"
-                gpu_info["capabilities"] = ["cpu_compute"]
-
-        return gpu_info
-
-    def _get_cpu_model(self) -> str:
-        """Get CPU model name"""
+            if not gpu:
+                gpu = {"model": "CPU-only (No GPU detected)", "capabilities": ("cpu_compute",)}
+
+        self.cached_static = GpuInfo(
+            os=platform.system() + " " + platform.release(),
+            cpu_model=self._get_cpu_model(),
+            ram_total_mb=self._get_total_ram(),
+            **gpu
+        )
+        return self.cached_static
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _get_cpu_model() -> str:
+        """Get CPU model name (read once per process)"""
         try:
             if platform.system() == "Linux":
-                with open("/proc/cpuinfo", "r") as f:
-                    for line in f:
-                        if "model name" in line:
-                            return line.split(":")[1].strip()
+                data = pathlib.Path("/proc/cpuinfo").read_text()
+                _, found, rest = data.partition("model name")
+                if found:
+                    return rest.partition(":")[2].partition("\n")[0].strip()
             return platform.processor()
         except:
             return "Unknown"
@@ -125,10 +185,12 @@ class GPUDetector:
 
     def get_gpu_stats(self) -> Dict:
         """Get current GPU utilization and health stats"""
+        # The handle is only set when pynvml imported and NVML initialised
+        if self._handle is None:
+            return {}
+
         try:
-            import pynvml
-            pynvml.nvmlInit()
-            handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+            handle = self._handle
 
             utilization = pynvml.nvmlDeviceGetUtilizationRates(handle)
             temperature = pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU)
@@ -141,8 +203,6 @@ class GPUDetector:
             mem_info = pynvml.nvmlDeviceGetMemoryInfo(handle)
             mem_utilization = (mem_info.used / mem_info.total) * 100
 
-            pynvml.nvmlShutdown()
-
             return {
                 "gpu_utilization": utilization.gpu,
                 "memory_utilization": mem_utilization,
@@ -156,9 +216,10 @@ class GPUDetector:
             log.warning("Failed to get GPU stats", error=str(e))
             return {}
 
-    def monitor_health(self) -> Dict:
-        """Monitor GPU health and detect issues"""
-        stats = self.get_gpu_stats()
+    def monitor_health(self, stats: Optional[Dict] = None) -> Dict:
+        """Monitor GPU health and detect issues, from already-sampled stats if given"""
+        if stats is None:
+            stats = self.get_gpu_stats()
 
         if not stats:
             return {"healthy": True, "issues": [], "stats": {}}
@@ -1,32 +1,34 @@
 """Heartbeat manager - sends periodic keep-alive signals"""
 
-import requests
+import httpx
 import structlog
 from typing import Optional
 
 from config import Config
+from rate_limited_logger import RateLimitedLogger
 
 log = structlog.get_logger()
+# Heartbeats fail every beat while the backend is down; log that at most every 30s
+throttled_log = RateLimitedLogger(log)
 
 
 class HeartbeatManager:
     """Manages heartbeat sending to keep node alive"""
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, client: httpx.AsyncClient):
         self.config = config
+        self.client = client
         self.node_id: Optional[str] = None
 
-    def send_heartbeat(self) -> bool:
+    async def send_heartbeat(self) -> bool:
         """Send heartbeat to backend"""
         try:
-            response = requests.post(
+            response = await self.client.post(
                 f"{self.config.backend_url}/api/nodes/heartbeat",
                 json={
                     "walletAddress": self.config.wallet_pubkey,
                     "status": "online"
-                },
-                headers={"Authorization": f"Bearer {self.config.node_token}"},
-                timeout=10
+                }
             )
 
             if response.status_code == 200:
@@ -37,5 +39,5 @@ class HeartbeatManager:
                 return False
 
         except Exception as e:
-            log.error("Heartbeat error", error=str(e))
+            throttled_log.error("Heartbeat error", error=str(e), error_class=type(e).__name__)
             return False
@@ -1,71 +1,93 @@
 """Job executor - polls for jobs and executes them"""
 
-import requests
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import orjson
 import structlog
-import time
 from typing import Optional, Dict
 
 from config import Config
+from encoding import encode_json
+from rate_limited_logger import RateLimitedLogger
 
 log = structlog.get_logger()
+# Every poll retries during a backend outage; log those retries at most every 30s
+throttled_log = RateLimitedLogger(log)
+
+# Seconds the backend may hold a poll open waiting for a job to arrive
+LONG_POLL_WAIT = 25
 
 
-def retry_with_backoff(func, max_retries=3, base_delay=1.0):
-    """Retry function with exponential backoff strategy"""
+async def retry_with_backoff(func, max_retries=3, base_delay=1.0):
+    """Retry coroutine function with exponential backoff strategy"""
     for attempt in range(max_retries):
         try:
-            return func()
-        except requests.exceptions.RequestException as e:
+            return await func()
+        except httpx.HTTPError as e:
             if attempt == max_retries - 1:
                 raise
             delay = base_delay * (2 ** attempt)
-            log.warning(
+            throttled_log.warning(
                 "Request failed, retrying",
                 attempt=attempt + 1,
                 max_retries=max_retries,
                 delay_seconds=delay,
-                error=str(e)
+                error=str(e),
+                error_class=type(e).__name__
             )
-            time.sleep(delay)
+            await asyncio.sleep(delay)
     return None
 
 
 class JobExecutor:
     """Polls for and executes compute jobs"""
 
-    def __init__(self, config: Config):
+    # Job type -> handler method name; unknown types run as generic jobs
+    _HANDLERS = {
+        "llm_inference": "_execute_llm_inference",
+        "llm_fine_tuning": "_execute_fine_tuning",
+        "rag_indexing": "_execute_rag_indexing",
+        "vision_pipeline": "_execute_vision",
+        "render": "_execute_render",
+    }
+
+    def __init__(self, config: Config, client: httpx.AsyncClient, job_pool: ThreadPoolExecutor):
         self.config = config
+        self.client = client
+        self.job_pool = job_pool
+        # Bind handlers once so dispatch is a single dict lookup
+        self._handlers = {job_type: getattr(self, name) for job_type, name in self._HANDLERS.items()}
+        self._default_handler = self._execute_generic
         self.current_job: Optional[Dict] = None
 
-    def poll_job(self) -> Optional[Dict]:
-        """Poll backend for available jobs"""
-        def _poll():
-            response = requests.get(
+    async def poll_job(self) -> Optional[Dict]:
+        """Long-poll backend for an available job
+
+        Raises httpx.HTTPError once retries are exhausted, so the caller can back off.
+        """
+        async def _poll():
+            response = await self.client.get(
                 f"{self.config.backend_url}/api/jobs/available",
-                headers={"Authorization": f"Bearer {self.config.node_token}"},
-                params={"wallet": self.config.wallet_pubkey},
-                timeout=10
+                params={"wallet": self.config.wallet_pubkey, "wait": LONG_POLL_WAIT},
+                timeout=LONG_POLL_WAIT + 5
             )
             response.raise_for_status()
             return response
 
-        try:
-            response = retry_with_backoff(_poll, max_retries=3, base_delay=1.0)
-
-            if response and response.status_code == 200:
-                data = response.json()
-                job = data.get("job")
-                if job:
-                    log.info("Job available", job_id=job.get("jobId"), type=job.get("jobType"))
-                    return job
+        response = await retry_with_backoff(_poll, max_retries=3, base_delay=1.0)
 
-            return None
+        if response and response.status_code == 200:
+            data = orjson.loads(response.content)
+            job = data.get("job")
+            if job:
+                log.info("Job available", job_id=job.get("jobId"), type=job.get("jobType"))
+                return job
 
-        except Exception as e:
-            log.error("Job polling error", error=str(e))
-            return None
+        return None
 
-    def execute_job(self, job: Dict) -> bool:
+    async def execute_job(self, job: Dict) -> bool:
         """Execute a received job"""
         job_id = job.get("jobId")
         job_type = job.get("jobType")
@@ -74,28 +96,20 @@ class JobExecutor:
 
         try:
             # Job type routing
-            if job_type == "llm_inference":
-                result = self._execute_llm_inference(job)
-            elif job_type == "llm_fine_tuning":
-                result = self._execute_fine_tuning(job)
-            elif job_type == "rag_indexing":
-                result = self._execute_rag_indexing(job)
-            elif job_type == "vision_pipeline":
-                result = self._execute_vision(job)
-            elif job_type == "render":
-                result = self._execute_render(job)
-            else:
-                result = self._execute_generic(job)
+            handler = self._handlers.get(job_type, self._default_handler)
+
+            # Handlers run blocking GPU/model code, so run them on the job pool
+            result = await asyncio.get_running_loop().run_in_executor(self.job_pool, handler, job)
 
             # Report result back to backend
-            self._report_result(job_id, result)
+            await self._report_result(job_id, result)
 
             log.info("Job completed", job_id=job_id)
             return True
 
         except Exception as e:
             log.error("Job execution failed", job_id=job_id, error=str(e))
-            self._report_failure(job_id, str(e))
+            await self._report_failure(job_id, str(e))
             return False
 
     def _execute_llm_inference(self, job: Dict) -> Dict:
@@ -143,37 +157,39 @@ class JobExecutor:
             "exit_code": 0
         }
 
-    def _report_result(self, job_id: str, result: Dict):
+    async def _report_result(self, job_id: str, result: Dict):
         """Report successful job result"""
-        def _report():
-            response = requests.post(
+        async def _report():
+            response = await self.client.post(
                 f"{self.config.backend_url}/api/jobs/{job_id}/result",
-                json={
-                    "nodeId": "current_node_id",  # Would get from registration
-                    "result": result,
-                    "logs": [],
-                    "metrics": {}
-                },
-                headers={"Authorization": f"Bearer {self.config.node_token}"},
-                timeout=10
+                content=body,
+                headers=headers
             )
             response.raise_for_status()
             return response
 
         try:
-            retry_with_backoff(_report, max_retries=5, base_delay=2.0)
+            # Encoded once here rather than per retry; an unserializable result
+            # is logged like a failed report instead of failing the job
+            body, headers = encode_json({
+                "nodeId": "current_node_id",  # Would get from registration
+                "result": result,
+                "logs": [],
+                "metrics": {}
+            })
+            await retry_with_backoff(_report, max_retries=5, base_delay=2.0)
             log.info("Result reported successfully", job_id=job_id)
         except Exception as e:
-            log.error("Failed to report result after retries", job_id=job_id, error=str(e))
+            log.error("Failed to report result", job_id=job_id, error=str(e))
 
-    def _report_failure(self, job_id: str, error: str):
+    async def _report_failure(self, job_id: str, error: str):
         """Report job failure"""
         try:
-            requests.post(
+            body, headers = encode_json({"error": error})
+            await self.client.post(
                 f"{self.config.backend_url}/api/jobs/{job_id}/failure",
-                json={"error": error},
-                headers={"Authorization": f"Bearer {self.config.node_token}"},
-                timeout=10
+                content=body,
+                headers=headers
             )
         except Exception as e:
             log.error("Failed to report failure", job_id=job_id, error=str(e))
@@ -4,53 +4,59 @@ Hypernode Node Client - Main Worker
 Detects GPU, registers with network, executes jobs, sends heartbeats
 """
 
+import asyncio
 import os
-import time
 import signal
 import sys
 import structlog
-from typing import Optional
-import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Set
 
-from config import Config
-from gpu_detector import GPUDetector
+import httpx
+import orjson
+
+from config import get_config
+from gpu_detector import GPUDetector, asdict_camel
 from heartbeat import HeartbeatManager
 from job_executor import JobExecutor
-from telemetry import TelemetryReporter
+from rate_limited_logger import RateLimitedLogger
+from scheduler import Scheduler
+from telemetry import SAMPLE_INTERVAL, TelemetryReporter
 
 # Setup logging
 log = structlog.get_logger()
+# For errors that repeat on every loop iteration during a backend outage
+throttled_log = RateLimitedLogger(log)
+
+# Job loop backoff: idle polls grow gently up to JOB_POLL_INTERVAL, errors double up to a minute
+IDLE_BACKOFF_BASE = 0.5
+IDLE_BACKOFF_FACTOR = 1.3
+ERROR_BACKOFF_BASE = 1.0
+ERROR_BACKOFF_MAX = 60
+
+# How long a graceful shutdown waits for running jobs before abandoning them
+JOB_SHUTDOWN_TIMEOUT = 5
 
 
 class HypernodeWorker:
     """Main worker class that orchestrates all node operations"""
 
     def __init__(self):
-        self.config = Config()
-        self.running = False
-        self.gpu_detector = GPUDetector()
+        # Raises ValueError on invalid configuration
+        self.config = get_config()
+        # Set by stop(); every loop waits on it instead of sleeping so shutdown is immediate
+        self._shutdown = asyncio.Event()
+        self.gpu_detector = GPUDetector(self.config.gpu_index)
+        self.client: Optional[httpx.AsyncClient] = None
         self.heartbeat_manager: Optional[HeartbeatManager] = None
         self.job_executor: Optional[JobExecutor] = None
         self.telemetry_reporter: Optional[TelemetryReporter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._job_loop: Optional[asyncio.Task] = None
+        self._job_pool: Optional[ThreadPoolExecutor] = None
+        self._job_tasks: Set[asyncio.Task] = set()
 
-    def validate_config(self) -> bool:
-        """Validate required configuration"""
-        is_valid, error_msg = self.config.validate()
-
-        if not is_valid:
-            log.error("Configuration validation failed", error=error_msg)
-            return False
-
-        log.info(
-            "Configuration validated",
-            heartbeat_interval=self.config.heartbeat_interval,
-            request_timeout=self.config.request_timeout,
-            job_poll_interval=self.config.job_poll_interval,
-            max_jobs=self.config.max_jobs_concurrent
-        )
-        return True
-
-    def register_node(self) -> bool:
+    async def register_node(self) -> bool:
         """Register node with the network"""
         log.info("Detecting GPU specifications...")
 
@@ -58,39 +64,32 @@ class HypernodeWorker:
 
         log.info(
             "GPU detected",
-            gpu_model=gpu_info.get("model", "Unknown"),
-            vram_mb=gpu_info.get("vram_mb", 0),
-            driver=gpu_info.get("driver_version", "Unknown")
+            gpu_model=gpu_info.model,
+            vram_mb=gpu_info.vram_mb,
+            driver=gpu_info.driver_version
         )
 
         # Send registration to backend
         try:
-            import requests
-            response = requests.post(
+            response = await self.client.post(
                 f"{self.config.backend_url}/api/nodes/register",
                 json={
                     "walletAddress": self.config.wallet_pubkey,
-                    "gpuModel": gpu_info.get("model", "Unknown"),
-                    "vram": gpu_info.get("vram_mb", 0) // 1024,  # Convert to GB
-                    "driverVersion": gpu_info.get("driver_version", "Unknown"),
-                    "cudaVersion": gpu_info.get("cuda_version", "Unknown"),
-                    "hostOS": gpu_info.get("os", "Unknown"),
-                    "cpuModel": gpu_info.get("cpu_model", "Unknown"),
-                    "ramTotal": gpu_info.get("ram_total_mb", 0),
+                    **asdict_camel(gpu_info),
                     "location": {
                         "country": "Unknown",
                         "city": "Unknown",
                         "lat": 0,
                         "lon": 0
-                    },
-                    "capabilities": gpu_info.get("capabilities", ["inference"])
-                },
-                headers={"Authorization": f"Bearer {self.config.node_token}"},
-                timeout=10
+                    }
+                }
             )
 
+            # Registration is the first request, so this reports what the pool negotiated
+            log.debug("Backend connection established", http_version=response.http_version)
+
             if response.status_code in [200, 201]:
-                data = response.json()
+                data = orjson.loads(response.content)
                 node_id = data.get("node", {}).get("nodeId")
                 log.info("Node registered successfully", node_id=node_id)
                 return True
@@ -103,109 +102,184 @@ class HypernodeWorker:
             return False
 
     def start(self):
-        """Start the worker"""
+        """Start the worker and block until it stops"""
+        asyncio.run(self.run())
+
+    async def run(self):
+        """Register the node and run every background loop on one event loop"""
         log.info("🚀 Hypernode Worker starting...")
         log.info(
             "Configuration",
             backend_url=self.config.backend_url,
             wallet=self.config.wallet_pubkey[:8] + "...",
-            heartbeat_interval=self.config.heartbeat_interval
+            heartbeat_interval=self.config.heartbeat_interval,
+            request_timeout=self.config.request_timeout,
+            job_poll_interval=self.config.job_poll_interval,
+            max_jobs=self.config.max_jobs_concurrent
         )
 
-        if not self.validate_config():
-            log.error("Invalid configuration - exiting")
-            sys.exit(1)
-
-        # Register node
-        if not self.register_node():
-            log.error("Failed to register node - retrying in 30s...")
-            time.sleep(30)
-            if not self.register_node():
-                log.error("Registration failed twice - exiting")
-                sys.exit(1)
+        self.client = self.config.build_client()
+        self._task = asyncio.current_task()
 
-        # Initialize components
-        self.heartbeat_manager = HeartbeatManager(self.config)
-        self.job_executor = JobExecutor(self.config)
-        self.telemetry_reporter = TelemetryReporter(self.config)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
 
-        # Start background threads
-        self.running = True
-
-        heartbeat_thread = threading.Thread(target=self._run_heartbeat_loop, daemon=True)
-        telemetry_thread = threading.Thread(target=self._run_telemetry_loop, daemon=True)
-        job_thread = threading.Thread(target=self._run_job_loop, daemon=True)
-
-        heartbeat_thread.start()
-        telemetry_thread.start()
-        job_thread.start()
+        forced = False
+        try:
+            # Register node
+            if not await self.register_node():
+                log.error("Failed to register node - retrying in 30s...")
+                if await self._sleep(30):
+                    return
+                if not await self.register_node():
+                    log.error("Registration failed twice - exiting")
+                    sys.exit(1)
+
+            # Initialize components
+            self._job_pool = ThreadPoolExecutor(
+                max_workers=self.config.max_jobs_concurrent,
+                thread_name_prefix="job"
+            )
+            self.heartbeat_manager = HeartbeatManager(self.config, self.client)
+            self.job_executor = JobExecutor(self.config, self.client, self._job_pool)
+            self.telemetry_reporter = TelemetryReporter(self.config, self.client, self.gpu_detector)
+
+            log.info("✅ Worker running - press Ctrl+C to stop")
+
+            # Heartbeat and telemetry share one timer; the job loop keeps its own
+            # because a long poll holds its request open for up to 25s
+            scheduler = Scheduler(self._sleep)
+            scheduler.schedule(self._send_heartbeat)
+            scheduler.schedule(self._report_telemetry)
+
+            self._job_loop = asyncio.create_task(self._run_job_loop())
+            # stop() cancels the job loop out of its long poll; the scheduler returns on its own
+            await asyncio.gather(scheduler.run(), self._job_loop, return_exceptions=True)
+
+            if self._job_tasks:
+                log.info("Waiting for running jobs to finish...", jobs=len(self._job_tasks))
+                _, pending = await asyncio.wait(self._job_tasks, timeout=JOB_SHUTDOWN_TIMEOUT)
+                if pending:
+                    forced = True
+                    log.warning("Jobs still running after shutdown timeout", jobs=len(pending))
+        except asyncio.CancelledError:
+            forced = True
+            log.warning("Shutdown forced")
+        finally:
+            if self._job_pool is not None:
+                if forced:
+                    # Don't block the event loop on running handlers; drop queued ones
+                    self._job_pool.shutdown(wait=False, cancel_futures=True)
+                else:
+                    # Running jobs were already awaited above, so this returns promptly
+                    self._job_pool.shutdown(wait=True)
+            await self.client.aclose()
+            log.info("Worker stopped")
+
+            if forced and self._job_tasks:
+                # Pool threads are non-daemon and would be joined at interpreter
+                # exit, so a handler still running would hold the process open
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(1)
+
+    async def _sleep(self, seconds: float) -> bool:
+        """Sleep for seconds, waking early on shutdown; returns True if shutting down"""
+        # wait_for with a zero timeout raises TimeoutError even for a set event (3.10/3.11)
+        if self._shutdown.is_set():
+            return True
 
-        log.info("✅ Worker running - press Ctrl+C to stop")
+        try:
+            await asyncio.wait_for(self._shutdown.wait(), timeout=seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
 
-        # Main loop (just keeps process alive)
+    async def _send_heartbeat(self) -> float:
+        """Scheduled task: send a heartbeat, returning seconds until the next one"""
         try:
-            while self.running:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            log.info("Shutdown signal received...")
-            self.stop()
-
-    def _run_heartbeat_loop(self):
-        """Background loop for sending heartbeats"""
-        while self.running:
-            try:
-                self.heartbeat_manager.send_heartbeat()
-                time.sleep(self.config.heartbeat_interval)
-            except Exception as e:
-                log.error("Heartbeat error", error=str(e))
-                time.sleep(5)
+            await self.heartbeat_manager.send_heartbeat()
+            return self.config.heartbeat_interval
+        except Exception as e:
+            log.error("Heartbeat error", error=str(e))
+            return 5
 
-    def _run_telemetry_loop(self):
-        """Background loop for reporting telemetry"""
-        while self.running:
-            try:
-                self.telemetry_reporter.report()
-                time.sleep(60)  # Report every minute
-            except Exception as e:
-                log.error("Telemetry error", error=str(e))
-                time.sleep(10)
+    async def _report_telemetry(self) -> float:
+        """Scheduled task: report telemetry, returning seconds until the next sample"""
+        try:
+            await self.telemetry_reporter.report()
+            return SAMPLE_INTERVAL
+        except Exception as e:
+            log.error("Telemetry error", error=str(e))
+            return 10
 
-    def _run_job_loop(self):
+    async def _run_job_loop(self):
         """Background loop for checking and executing jobs"""
-        while self.running:
+        idle_backoff = IDLE_BACKOFF_BASE
+        error_backoff = ERROR_BACKOFF_BASE
+        # One slot per job pool worker; polling waits while every slot is taken
+        # so the node never accepts more jobs than it can run
+        slots = asyncio.Semaphore(self.config.max_jobs_concurrent)
+
+        while not self._shutdown.is_set():
+            await slots.acquire()
             try:
                 # Poll for available jobs
-                job = self.job_executor.poll_job()
+                job = await self.job_executor.poll_job()
+                error_backoff = ERROR_BACKOFF_BASE
+
                 if job:
                     log.info("Job received", job_id=job.get("jobId"))
-                    self.job_executor.execute_job(job)
+                    task = asyncio.create_task(self._run_job(job, slots))
+                    self._job_tasks.add(task)
+                    task.add_done_callback(self._job_tasks.discard)
+                    idle_backoff = IDLE_BACKOFF_BASE
                 else:
-                    time.sleep(self.config.job_poll_interval)
+                    slots.release()
+                    if await self._sleep(idle_backoff):
+                        break
+                    idle_backoff = min(idle_backoff * IDLE_BACKOFF_FACTOR, self.config.job_poll_interval)
             except Exception as e:
-                log.error("Job execution error", error=str(e))
-                time.sleep(5)
+                slots.release()
+                throttled_log.error(
+                    "Job loop error",
+                    error=str(e),
+                    error_class=type(e).__name__,
+                    retry_in=error_backoff
+                )
+                if await self._sleep(error_backoff):
+                    break
+                error_backoff = min(error_backoff * 2, ERROR_BACKOFF_MAX)
+
+    async def _run_job(self, job: dict, slots: asyncio.Semaphore):
+        """Execute one job and free its slot for the polling loop"""
+        try:
+            await self.job_executor.execute_job(job)
+        finally:
+            slots.release()
 
     def stop(self):
-        """Stop the worker gracefully"""
+        """Stop the worker gracefully; a second call forces an immediate exit"""
+        if self._shutdown.is_set():
+            self._task.cancel()
+            return
+
         log.info("Stopping worker...")
-        self.running = False
-        time.sleep(2)
-        log.info("Worker stopped")
-        sys.exit(0)
+        self._shutdown.set()
+        if self._job_loop is not None:
+            self._job_loop.cancel()
 
 
 def main():
     """Entry point"""
-    # Setup signal handlers
-    def signal_handler(sig, frame):
-        log.info("Signal received, shutting down...")
-        sys.exit(0)
-
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-
     # Start worker
-    worker = HypernodeWorker()
+    try:
+        worker = HypernodeWorker()
+    except ValueError as e:
+        log.error("Invalid configuration - exiting", error=str(e))
+        sys.exit(1)
+
     worker.start()
 
 
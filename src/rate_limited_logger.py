@@ -0,0 +1,44 @@
+"""Throttled logging for errors that repeat on every loop iteration"""
+
+import time
+import structlog
+from typing import Dict, Tuple
+
+# Minimum seconds between two logs of the same (message, error_class)
+DEFAULT_INTERVAL = 30
+
+
+class RateLimitedLogger:
+    """Logs each repeating error at most once per interval
+
+    Meant for transport errors that recur every tick during a backend
+    outage; one-off errors should go through the normal logger.
+    """
+
+    def __init__(self, logger=None, interval: float = DEFAULT_INTERVAL):
+        self._log = logger if logger is not None else structlog.get_logger()
+        self.interval = interval
+        # (message, error_class) -> (last logged at, occurrences suppressed since)
+        self._last: Dict[Tuple[str, str], Tuple[float, int]] = {}
+
+    def error(self, msg: str, **kw):
+        """Log msg at error level unless the same error was logged within the interval"""
+        self._emit(self._log.error, msg, kw)
+
+    def warning(self, msg: str, **kw):
+        """Log msg at warning level unless the same error was logged within the interval"""
+        self._emit(self._log.warning, msg, kw)
+
+    def _emit(self, log_method, msg: str, kw: dict):
+        now = time.monotonic()
+        key = (msg, kw.get("error_class", ""))
+        last, suppressed = self._last.get(key, (float('-inf'), 0))
+
+        if now - last < self.interval:
+            self._last[key] = (last, suppressed + 1)
+            return
+
+        if suppressed:
+            kw["suppressed"] = suppressed
+        log_method(msg, **kw)
+        self._last[key] = (now, 0)
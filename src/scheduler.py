@@ -0,0 +1,90 @@
+"""Single-timer scheduler for the worker's periodic tasks"""
+
+import asyncio
+import heapq
+import itertools
+import time
+import structlog
+from typing import Awaitable, Callable, List, Set, Tuple
+
+log = structlog.get_logger()
+
+# Tasks due within this many seconds of the earliest one fire on the same wakeup
+COALESCE_WINDOW = 1.0
+# Delay before re-running a task that raised instead of returning its next interval
+FAILED_TASK_DELAY = 10
+# Longest single wait while every task is running; a finishing task wakes the loop sooner
+MAX_WAIT = 60
+
+# A periodic task runs once and returns the seconds until it should run again
+PeriodicTask = Callable[[], Awaitable[float]]
+
+
+class Scheduler:
+    """Runs periodic tasks off one heap of deadlines instead of a sleeping loop each"""
+
+    def __init__(self, sleep: Callable[[float], Awaitable[bool]]):
+        # sleep(seconds) returns True when the worker is shutting down
+        self._sleep = sleep
+        # (deadline, sequence, task); the sequence breaks ties since tasks don't compare
+        self._queue: List[Tuple[float, int, PeriodicTask]] = []
+        self._sequence = itertools.count()
+        # Tasks currently running; each reschedules itself when it finishes
+        self._running: Set[asyncio.Task] = set()
+        # Set when a finished task pushes a deadline the loop may not be waiting for
+        self._rescheduled = asyncio.Event()
+
+    def schedule(self, task: PeriodicTask, delay: float = 0):
+        """Run task after delay seconds, then at whatever interval it returns"""
+        heapq.heappush(self._queue, (time.monotonic() + delay, next(self._sequence), task))
+        self._rescheduled.set()
+
+    async def run(self):
+        """Fire tasks as they fall due until shutdown"""
+        while self._queue or self._running:
+            self._rescheduled.clear()
+            wait = self._queue[0][0] - time.monotonic() if self._queue else MAX_WAIT
+            if await self._wait(max(wait, 0)):
+                break
+            if not self._queue or self._queue[0][0] > time.monotonic():
+                # Woken by a reschedule rather than a deadline
+                continue
+
+            # Start everything due now together so their requests share the
+            # HTTP/2 connection concurrently rather than waking separately.
+            # Each runs as its own task so a slow one can't hold back the
+            # others' next deadlines.
+            cutoff = time.monotonic() + COALESCE_WINDOW
+            while self._queue and self._queue[0][0] <= cutoff:
+                self._start(heapq.heappop(self._queue)[2])
+
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def _wait(self, seconds: float) -> bool:
+        """Sleep until seconds pass or a task is rescheduled; returns True on shutdown"""
+        sleep = asyncio.ensure_future(self._sleep(seconds))
+        rescheduled = asyncio.ensure_future(self._rescheduled.wait())
+        try:
+            await asyncio.wait({sleep, rescheduled}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sleep.cancel()
+            rescheduled.cancel()
+        return sleep.done() and not sleep.cancelled() and sleep.result()
+
+    def _start(self, task: PeriodicTask):
+        running = asyncio.create_task(task())
+        self._running.add(running)
+        running.add_done_callback(lambda finished: self._finished(task, finished))
+
+    def _finished(self, task: PeriodicTask, finished: asyncio.Task):
+        self._running.discard(finished)
+        if finished.cancelled():
+            return
+
+        error = finished.exception()
+        if error is not None:
+            log.error("Scheduled task failed", task=task.__name__, error=str(error))
+            self.schedule(task, FAILED_TASK_DELAY)
+        else:
+            self.schedule(task, finished.result())
@@ -1,54 +1,116 @@
 """Telemetry reporter - sends GPU/system metrics"""
 
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import httpx
 import psutil
 import structlog
-from typing import Dict
+from typing import Dict, List
 
 from config import Config
+from encoding import encode_json
+from rate_limited_logger import RateLimitedLogger
 from gpu_detector import GPUDetector
 
 log = structlog.get_logger()
+# Flushes fail every minute while the backend is down; log that at most every 30s
+throttled_log = RateLimitedLogger(log)
+
+# Samples are taken every SAMPLE_INTERVAL seconds and sent together in one request
+SAMPLE_INTERVAL = 10
+FLUSH_INTERVAL = 60
+MAX_BATCH_SIZE = 30
+# Samples kept across failed flushes before the oldest are dropped
+MAX_BUFFERED_SAMPLES = 360
+# Disk fill barely moves between samples, so statvfs is only re-read this often
+DISK_USAGE_TTL = 300
 
 
 class TelemetryReporter:
     """Reports system and GPU telemetry"""
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, client: httpx.AsyncClient, gpu_detector: GPUDetector):
         self.config = config
-        self.gpu_detector = GPUDetector()
-
-    def report(self):
-        """Collect and report telemetry"""
-        try:
-            metrics = self._collect_metrics()
+        self.client = client
+        self.gpu_detector = gpu_detector
+        self._buffer: List[Dict] = []
+        self._last_flush = time.monotonic()
+        # Samples added since the last flush attempt; after a failed flush the
+        # buffer stays large, so its length alone would trigger a POST every sample
+        self._new_samples = 0
+        # (monotonic time read, percent used); -inf forces a read on the first sample
+        self._disk_cache = (float('-inf'), 0.0)
 
-            # Check GPU health
-            health = self.gpu_detector.monitor_health()
-            metrics["gpu_health"] = health
+        # cpu_percent(interval=None) measures since the previous call, so prime it once
+        psutil.cpu_percent(interval=None)
 
-            # Log warnings if unhealthy
-            if not health["healthy"]:
-                log.warning("GPU health issues detected", issues=health["issues"])
+    async def report(self):
+        """Collect a telemetry sample and flush the batch when it is due"""
+        try:
+            # psutil and NVML calls block, so keep them off the event loop
+            metrics = await asyncio.to_thread(self._collect_metrics)
 
+            # monitor_health has already logged any GPU health issues
             log.debug("Telemetry collected", **metrics)
 
-            # In production, send to backend
-            # requests.post(f"{self.config.backend_url}/api/telemetry", json=metrics)
+            metrics["timestamp"] = datetime.now(timezone.utc).isoformat()
+            self._buffer.append(metrics)
+            self._new_samples += 1
 
         except Exception as e:
             log.error("Telemetry collection error", error=str(e))
 
+        if self._new_samples >= MAX_BATCH_SIZE or time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            await self.flush()
+
+    async def flush(self):
+        """Send every buffered sample to the backend in a single request"""
+        self._last_flush = time.monotonic()
+        self._new_samples = 0
+        if not self._buffer:
+            return
+
+        try:
+            body, headers = encode_json({"samples": self._buffer})
+            response = await self.client.post(
+                f"{self.config.backend_url}/api/telemetry",
+                content=body,
+                headers=headers
+            )
+            response.raise_for_status()
+            log.debug("Telemetry flushed", samples=len(self._buffer))
+            self._buffer = []
+
+        except Exception as e:
+            # Keep the samples for the next flush, bounded so an outage can't grow memory
+            del self._buffer[:-MAX_BUFFERED_SAMPLES]
+            throttled_log.error(
+                "Telemetry flush error",
+                error=str(e),
+                error_class=type(e).__name__,
+                buffered=len(self._buffer)
+            )
+
     def _collect_metrics(self) -> Dict:
         """Collect system metrics"""
+        now = time.monotonic()
+        if now - self._disk_cache[0] > DISK_USAGE_TTL:
+            self._disk_cache = (now, psutil.disk_usage('/').percent)
+
         metrics = {
-            "cpu_percent": psutil.cpu_percent(interval=1),
+            "cpu_percent": psutil.cpu_percent(interval=None),
             "ram_percent": psutil.virtual_memory().percent,
-            "disk_percent": psutil.disk_usage('/').percent,
+            "disk_percent": self._disk_cache[1],
         }
 
-        # Get detailed GPU stats using detector
+        # Only dynamic stats are sampled per tick; static specs come from detect() at startup.
+        # Query NVML once and judge health from the same sample
         gpu_stats = self.gpu_detector.get_gpu_stats()
         if gpu_stats:
             metrics.update(gpu_stats)
 
+        metrics["gpu_health"] = self.gpu_detector.monitor_health(gpu_stats)
+
         return metrics